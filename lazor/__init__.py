@@ -8,25 +8,30 @@ via the `__all__` variable, which specifies the symbols to be exposed when
 
 Available Components:
 - LazorConfig: Parses and holds configuration data from .bff puzzle files.
+- PuzzleCore: Integer-coded puzzle shared by all solvers and the laser tracer.
 - GridBuilder: Manages the game grid and block placement logic.
 - BlockBehavior: Determines how blocks interact with laser beams.
 - LightPath: Handles simulation of laser paths through the grid.
 - export_solution: Outputs the solved board configuration and visualizations.
+- BatchExporter: Streams many solutions into one JSON-lines file and contact sheet.
 
 """
 
 # Import all key components of the lazor solver package
 from lazor.config import LazorConfig
+from lazor.core import PuzzleCore
 from lazor.grid import GridBuilder
 from lazor.block import BlockBehavior
 from lazor.lightpath import LightPath
-from lazor.exporter import export_solution
+from lazor.exporter import export_solution, BatchExporter
 
 # Define public API for package-level imports
 __all__ = [
     "LazorConfig",
+    "PuzzleCore",
     "GridBuilder",
     "BlockBehavior",
     "LightPath",
-    "export_solution"
+    "export_solution",
+    "BatchExporter"
 ]
@@ -1,3 +1,9 @@
+# Static (reflect, transmit) lookup for every block type
+# Any other symbol ('o', 'x', '') is transparent space
+BLOCK_PROPERTIES = {'A': (True, False), 'B': (False, False), 'C': (True, True)}
+TRANSPARENT = (False, True)
+
+
 class BlockBehavior:
     """
     Represents the behavior of a block located on the mesh grid.
@@ -14,6 +20,8 @@ class BlockBehavior:
             Returns reflection and transmission behavior based on block type.
     """
 
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
         """
         Initializes the BlockBehavior instance with block coordinates.
@@ -41,18 +49,5 @@ class BlockBehavior:
         Returns:
             tuple: A pair (reflect, transmit) as booleans.
         """
-        # Identify the block type at the specified mesh coordinates
-        block = mesh[self.y][self.x]
-
-        # Default: transparent space (not a block)
-        reflect, transmit = False, True
-
-        # Assign behavior based on block type
-        if block == 'A':
-            reflect, transmit = True, False
-        elif block == 'B':
-            reflect, transmit = False, False
-        elif block == 'C':
-            reflect, transmit = True, True
-
-        return reflect, transmit
+        # Look up the block type at the specified mesh coordinates
+        return BLOCK_PROPERTIES.get(mesh[self.y][self.x], TRANSPARENT)
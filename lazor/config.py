@@ -1,3 +1,5 @@
+from lazor.core import PuzzleCore
+
 class LazorConfig:
     """
     LazorConfig parses a .bff input file to extract all configuration data required
@@ -78,3 +80,13 @@ class LazorConfig:
             # Parse target points
             elif key == 'P':
                 self.targets.append(tuple(map(int, line[1:].split())))
+
+    def to_core(self):
+        """
+        Converts the parsed configuration into the shared integer-coded puzzle core.
+
+        Returns:
+            PuzzleCore: Encoded grid, block counts (A, B, C), lasers and targets.
+        """
+        blocks = (self.available_blocks['A'], self.available_blocks['B'], self.available_blocks['C'])
+        return PuzzleCore.from_layout(self.grid_layout, blocks, self.lazers, self.targets)
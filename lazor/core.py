@@ -0,0 +1,470 @@
+from array import array
+from itertools import combinations, product, repeat
+
+from lazor.block import BLOCK_PROPERTIES, TRANSPARENT
+
+# Integer codes used for every cell of the expanded mesh
+VOID, OPEN, FIXED, REFLECT, OPAQUE, REFRACT = range(6)
+
+# Translation between board symbols and cell codes
+# '' is the empty lattice point written by the numpy reader
+SYMBOL_CODES = {'': VOID, 'o': OPEN, 'x': FIXED, 'A': REFLECT, 'B': OPAQUE, 'C': REFRACT}
+CODE_SYMBOLS = ('', 'o', 'x', 'A', 'B', 'C')
+
+# What a beam does on meeting each cell code, derived once from the
+# (reflect, transmit) table: PASS = transmit only, SPLIT = both,
+# STOP = neither, BOUNCE = reflect only
+PASS, SPLIT, STOP, BOUNCE = range(4)
+CODE_ACTIONS = tuple(
+    reflect + 2 * (not transmit)
+    for reflect, transmit in (BLOCK_PROPERTIES.get(sym, TRANSPARENT) for sym in CODE_SYMBOLS)
+)
+
+
+class Beam:
+    """
+    A single laser beam followed during a trace.
+
+    Attributes:
+        x (int): x-coordinate the beam starts from.
+        y (int): y-coordinate the beam starts from.
+        dx (int): Initial x-direction of the beam.
+        dy (int): Initial y-direction of the beam.
+        split (bool): True if the beam was split off by a refract (C) block.
+        path (array or None): Flat indices of every point visited, only kept
+            when the trace was asked for its history.
+    """
+
+    __slots__ = ('x', 'y', 'dx', 'dy', 'split', 'path')
+
+    def __init__(self, x, y, dx, dy, split=False, history=False):
+        """
+        Initializes the Beam from its origin and direction.
+
+        Args:
+            x (int): Starting x-coordinate.
+            y (int): Starting y-coordinate.
+            dx (int): Starting x-direction.
+            dy (int): Starting y-direction.
+            split (bool): Whether the beam comes from a refract block.
+            history (bool): Whether to record the visited points.
+        """
+        self.x, self.y, self.dx, self.dy = x, y, dx, dy
+        self.split = split
+        self.path = array('i') if history else None
+
+
+class PuzzleCore:
+    """
+    Integer-coded representation of a Lazor puzzle shared by every front end.
+
+    Both the `lazor` package (LazorConfig) and the legacy numpy reader convert
+    their board into a PuzzleCore once, so that placement enumeration and laser
+    tracing run on the same flat `array('b')` of cell codes.
+
+    Attributes:
+        width (int): Number of columns in the expanded mesh (2*cols+1).
+        height (int): Number of rows in the expanded mesh (2*rows+1).
+        cells (array): Flat row-major mesh of cell codes (VOID, OPEN, FIXED, ...).
+        open_slots (list of int): Flat indices of the cells where blocks can be placed.
+        blocks (tuple of int): (num_A, num_B, num_C) movable blocks to place.
+        lasers (list of tuple): Each element is ((x, y), (dx, dy)).
+        targets (set of int): Flat indices of the points the lasers must hit.
+        trials (int): Number of placements tried by the last `solve`.
+        exhausted (bool): True if the last `solve` tried every placement.
+    """
+
+    def __init__(self, mesh, blocks=(0, 0, 0), lasers=(), targets=()):
+        """
+        Initializes the PuzzleCore from an expanded mesh of board symbols.
+
+        Args:
+            mesh (2D iterable of str): Expanded mesh, indexed mesh[y][x].
+            blocks (tuple of int): (num_A, num_B, num_C) movable blocks to place.
+            lasers (iterable of tuple): Laser origins and directions ((x, y), (dx, dy)).
+            targets (iterable of tuple): Target points (x, y).
+
+        Raises:
+            ValueError: If the mesh contains an unknown symbol, or a laser origin
+                or target lies outside the mesh.
+        """
+        rows = [list(row) for row in mesh]
+        self.height = len(rows)
+        self.width = len(rows[0]) if rows else 0
+
+        # Encode every symbol once into a flat array of small integers
+        try:
+            self.cells = array('b', [SYMBOL_CODES[str(sym)] for row in rows for sym in row])
+        except KeyError as err:
+            raise ValueError(f"Unknown grid symbol {err.args[0]!r}") from None
+
+        self.open_slots = [i for i, code in enumerate(self.cells) if code == OPEN]
+        self.blocks = tuple(blocks)
+        self.lasers = [(tuple(start), tuple(direction)) for start, direction in lasers]
+        targets = [tuple(target) for target in targets]
+
+        # Points off the mesh would alias other cells through their flat index
+        for x, y in [start for start, _ in self.lasers] + targets:
+            if not (0 <= x < self.width and 0 <= y < self.height):
+                raise ValueError(f"Point {(x, y)} lies outside the {self.width}x{self.height} mesh")
+        self.targets = {self.index(x, y) for x, y in targets}
+
+        # Preallocated trace buffers; a cell counts as marked when it holds
+        # the stamp of the current trace, so they never need clearing.
+        # Plain lists are used since reading an array('i') boxes every value.
+        self._stamp = 0
+        self._hit_marks = [0] * len(self.cells)
+        self._seen_marks = [0] * (4 * len(self.cells))
+        self._symmetries = None
+        self.trials, self.exhausted = 0, False
+
+    @classmethod
+    def from_layout(cls, layout, blocks=(0, 0, 0), lasers=(), targets=()):
+        """
+        Builds a PuzzleCore from a block-level layout (one symbol per block).
+
+        Args:
+            layout (list of list of str): Grid layout as parsed by LazorConfig.
+            blocks (tuple of int): (num_A, num_B, num_C) movable blocks to place.
+            lasers (iterable of tuple): Laser origins and directions.
+            targets (iterable of tuple): Target points (x, y).
+
+        Returns:
+            PuzzleCore: The encoded puzzle.
+        """
+        rows, cols = len(layout), len(layout[0]) if layout else 0
+
+        # Expand to the (2*rows+1)x(2*cols+1) mesh with empty lattice points
+        mesh = [[''] * (2 * cols + 1) for _ in range(2 * rows + 1)]
+        for y in range(rows):
+            for x in range(cols):
+                mesh[2 * y + 1][2 * x + 1] = layout[y][x]
+
+        return cls(mesh, blocks, lasers, targets)
+
+    def index(self, x, y):
+        """Returns the flat cell index of mesh point (x, y)."""
+        return y * self.width + x
+
+    def point(self, index):
+        """Returns the mesh point (x, y) of a flat cell index."""
+        return index % self.width, index // self.width
+
+    def _transforms(self):
+        """
+        Lists the mirror/rotation maps that keep the mesh and its edge parity intact.
+
+        Yields:
+            tuple: (point_map, direction_map), each mapping an (x, y) pair.
+        """
+        w, h = self.width - 1, self.height - 1
+        # Mirrors only keep block cells on odd coordinates for odd mesh sizes
+        flips = [False, True] if w % 2 == 0 and h % 2 == 0 else [False]
+        swaps = [False, True] if w == h else [False]
+
+        for swap, fx, fy in product(swaps, flips, flips):
+            def point(x, y, swap=swap, fx=fx, fy=fy):
+                if swap:
+                    x, y = y, x
+                return (w - x if fx else x), (h - y if fy else y)
+
+            def direction(dx, dy, swap=swap, fx=fx, fy=fy):
+                if swap:
+                    dx, dy = dy, dx
+                return (-dx if fx else dx), (-dy if fy else dy)
+
+            yield point, direction
+
+    def symmetries(self):
+        """
+        Finds the automorphisms of the puzzle (grid, lasers and targets together).
+
+        A transform counts only if it maps every cell onto one with the same code
+        and maps the set of lasers and the set of targets onto themselves, so any
+        placement and its image hit the same targets.
+
+        Returns:
+            list of tuple: (perm, inv) per automorphism, identity first, where
+            perm[i] is the open slot that slot i is mapped to and inv its inverse.
+        """
+        if self._symmetries is not None:
+            return self._symmetries
+
+        lasers = set(self.lasers)
+        slot_of = {cell: i for i, cell in enumerate(self.open_slots)}
+        self._symmetries = []
+
+        for point, direction in self._transforms():
+            cells_match = all(
+                self.cells[self.index(*point(*self.point(pos)))] == code
+                for pos, code in enumerate(self.cells)
+            )
+            if not cells_match:
+                continue
+            if {(point(*start), direction(*d)) for start, d in self.lasers} != lasers:
+                continue
+            if {self.index(*point(*self.point(t))) for t in self.targets} != self.targets:
+                continue
+
+            perm = tuple(slot_of[self.index(*point(*self.point(cell)))] for cell in self.open_slots)
+            inv = [0] * len(perm)
+            for i, j in enumerate(perm):
+                inv[j] = i
+            self._symmetries.append((perm, tuple(inv)))
+
+        return self._symmetries
+
+    @staticmethod
+    def _choose(free, k, group):
+        """
+        Enumerates the k-subsets of `free` slots that are minimal in their orbit.
+
+        Subsets are compared as sorted tuples, so a subset is kept only when no
+        group element maps it onto a smaller one.
+
+        Args:
+            free (list of int): Sorted slot indices still available.
+            k (int): Number of slots to choose.
+            group (list of tuple): (perm, inv) pairs permuting `free` onto itself.
+
+        Returns:
+            iterable of tuple: (positions, stabilizer), the chosen slots and the
+            group elements that map them onto themselves.
+        """
+        # Without symmetries every subset is its own class
+        if len(group) == 1:
+            return zip(combinations(free, k), repeat(group))
+        if k == 0:
+            return [((), group)]
+        return PuzzleCore._orbit_minimal(free, k, group)
+
+    @staticmethod
+    def _orbit_minimal(free, k, group):
+        """
+        Generator behind `_choose` for a non-trivial group and k > 0.
+        """
+        # A minimal subset cannot contain a slot that some element maps below its smallest slot
+        orbit_min = {s: min(perm[s] for perm, _ in group) for s in free}
+
+        for first in free:
+            if orbit_min[first] != first:
+                continue
+            rest = [s for s in free if s > first and orbit_min[s] >= first]
+            for tail in combinations(rest, k - 1):
+                pos = (first,) + tail
+                stabilizer = []
+                for perm, inv in group:
+                    # Images not containing `first` start higher, so they are larger
+                    if inv[first] not in pos:
+                        continue
+                    image = tuple(sorted([perm[s] for s in pos]))
+                    if image < pos:
+                        break
+                    if image == pos:
+                        stabilizer.append((perm, inv))
+                else:
+                    yield pos, stabilizer
+
+    def placements(self, canonical=False):
+        """
+        Enumerates every distinct assignment of the movable blocks to open slots.
+
+        Args:
+            canonical (bool): Only yield one placement per class of placements
+                that the puzzle's symmetries map onto each other.
+
+        Yields:
+            tuple of int: One cell code per entry of `open_slots` (OPEN if left empty).
+        """
+        num_a, num_b, num_c = self.blocks
+        slots = range(len(self.open_slots))
+        group = self.symmetries() if canonical else [(tuple(slots), tuple(slots))]
+
+        # Place C blocks first, then A, then B among the remaining slots,
+        # narrowing the group to the elements that fix what is already placed
+        for c_pos, c_group in self._choose(list(slots), num_c, group):
+            c_free = [i for i in slots if i not in c_pos]
+            for a_pos, a_group in self._choose(c_free, num_a, c_group):
+                a_free = [i for i in c_free if i not in a_pos]
+                for b_pos, _ in self._choose(a_free, num_b, a_group):
+                    layout = [OPEN] * len(slots)
+                    for i in c_pos:
+                        layout[i] = REFRACT
+                    for i in a_pos:
+                        layout[i] = REFLECT
+                    for i in b_pos:
+                        layout[i] = OPAQUE
+                    yield tuple(layout)
+
+    def equivalents(self, layout):
+        """
+        Maps a placement through every symmetry of the puzzle.
+
+        Since the puzzle maps onto itself, each of these placements solves it
+        exactly when `layout` does.
+
+        Args:
+            layout (tuple of int): Placement as yielded by `placements`.
+
+        Returns:
+            set of tuple: All placements equivalent to `layout`, itself included.
+        """
+        return {tuple(layout[i] for i in inv) for _, inv in self.symmetries()}
+
+    def apply(self, layout, cells=None):
+        """
+        Writes a placement into a cell array.
+
+        Args:
+            layout (tuple of int): Placement as yielded by `placements`.
+            cells (array, optional): Array to update; a fresh copy of `cells` if omitted.
+
+        Returns:
+            array: The updated cell array.
+        """
+        if cells is None:
+            cells = array('b', self.cells)
+        for slot, code in zip(self.open_slots, layout):
+            cells[slot] = code
+        return cells
+
+    def _run(self, cells, beams=None):
+        """
+        Runs every laser (including beams split by C blocks) through the mesh.
+
+        Visited points are marked in `_hit_marks` with the stamp returned.
+
+        Args:
+            cells (array): Cell codes to trace through.
+            beams (list, optional): If given, every Beam is appended to it with its path.
+
+        Returns:
+            int: Stamp marking the points hit by this trace.
+        """
+        # Advance the stamp instead of clearing the buffers
+        self._stamp += 1
+
+        stamp, hit, seen = self._stamp, self._hit_marks, self._seen_marks
+        width, height = self.width, self.height
+        history = beams is not None
+        actions, stop, split_action = CODE_ACTIONS, STOP, SPLIT
+        stack = [(x, y, dx, dy, False) for (x, y), (dx, dy) in reversed(self.lasers)]
+
+        while stack:
+            x, y, dx, dy, split = stack.pop()
+
+            # Beam objects (and their paths) are only built when recording history
+            path = None
+            if history:
+                beam = Beam(x, y, dx, dy, split, history)
+                beams.append(beam)
+                path = beam.path
+
+            while 0 <= x < width and 0 <= y < height:
+                pos = y * width + x
+
+                # Stop once a beam repeats a state (closed loop or merged beam)
+                state = pos * 4 + (dx > 0) * 2 + (dy > 0)
+                if seen[state] == stamp:
+                    break
+                seen[state] = stamp
+                hit[pos] = stamp
+                if path is not None:
+                    path.append(pos)
+
+                # Odd x means the beam sits on a horizontal edge and crosses in y
+                if x & 1:
+                    bx, by = x, y + dy
+                else:
+                    bx, by = x + dx, y
+                code = cells[by * width + bx] if 0 <= bx < width and 0 <= by < height else VOID
+                action = actions[code]
+
+                if action:
+                    if action == stop:
+                        break
+                    # Transmitted part of a refract block carries on as a new beam
+                    if action == split_action:
+                        stack.append((x + dx, y + dy, dx, dy, True))
+                    if x & 1:
+                        dy = -dy
+                    else:
+                        dx = -dx
+
+                x += dx
+                y += dy
+
+        return stamp
+
+    def trace(self, cells=None, beams=None):
+        """
+        Traces every laser (including beams split by C blocks) through the mesh.
+
+        Args:
+            cells (array, optional): Cell codes to trace through; defaults to `cells`.
+            beams (list, optional): If given, every Beam is appended to it with its
+                full path history (e.g. for plotting).
+
+        Returns:
+            set of int: Flat indices of every mesh point touched by a laser.
+        """
+        stamp = self._run(self.cells if cells is None else cells, beams)
+        return {pos for pos, mark in enumerate(self._hit_marks) if mark == stamp}
+
+    def hits_targets(self, cells=None):
+        """
+        Checks whether the lasers hit every target, without building the hit set.
+
+        Args:
+            cells (array, optional): Cell codes to trace through; defaults to `cells`.
+
+        Returns:
+            bool: True if every target point is hit.
+        """
+        stamp = self._run(self.cells if cells is None else cells)
+        hit = self._hit_marks
+        for target in self.targets:
+            if hit[target] != stamp:
+                return False
+        return True
+
+    def solve(self, max_trials=None, canonical=True):
+        """
+        Searches the placements for one whose lasers hit every target.
+
+        The number of placements tried is left in `trials`, and `exhausted`
+        tells whether every placement was tried (so None means no solution exists).
+
+        Args:
+            max_trials (int, optional): Maximum number of placements to try.
+            canonical (bool): Skip placements equivalent under the puzzle's symmetries.
+
+        Returns:
+            tuple or None: (layout, hits) for the first solution, or None if none found.
+        """
+        cells = array('b', self.cells)
+        self.trials, self.exhausted = 0, False
+        for layout in self.placements(canonical):
+            if max_trials is not None and self.trials >= max_trials:
+                return None
+            self.trials += 1
+            if self.hits_targets(self.apply(layout, cells)):
+                return layout, self.trace(cells)
+        self.exhausted = True
+        return None
+
+    def to_mesh(self, layout=None):
+        """
+        Decodes the cells (with an optional placement applied) back to symbols.
+
+        Args:
+            layout (tuple of int, optional): Placement as yielded by `placements`.
+
+        Returns:
+            list of list of str: Expanded mesh of board symbols, indexed mesh[y][x].
+        """
+        cells = self.cells if layout is None else self.apply(layout)
+        return [
+            [CODE_SYMBOLS[code] for code in cells[y * self.width:(y + 1) * self.width]]
+            for y in range(self.height)
+        ]
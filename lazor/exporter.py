@@ -1,7 +1,40 @@
 import os
+import json
+import math
 import matplotlib.pyplot as plt
+from matplotlib.colors import ListedColormap
 
-def export_solution(mesh, name, metadata):
+# Colours used for the contact sheet image (index = cell value)
+# Open cells are white, fixed 'x' cells gray and the gaps between boards light gray
+SHEET_COLORS = ['white', 'blue', 'black', 'orange', 'gray', 'lightgray']
+SHEET_VALUES = {'A': 1, 'B': 2, 'C': 3, 'x': 4}
+SHEET_GAP = 5
+# Pixels per cell on the contact sheet
+SHEET_SCALE = 4
+
+
+def _board_rows(mesh):
+    """
+    Extracts the block cells of a mesh as rows of symbols.
+
+    Args:
+        mesh (list of list of str): The 2D mesh representation of the puzzle grid.
+
+    Returns:
+        list of list of str: One row of block symbols per grid row.
+    """
+    # Flatten the mesh into a list of only block cells (ignore even-indexed rows/cols)
+    result = [mesh[j][i] for j in range(1, len(mesh), 2)
+                           for i in range(1, len(mesh[0]), 2)]
+
+    # Determine the number of columns in the original grid
+    width = (len(mesh[0]) - 1) // 2
+
+    # Convert the flattened result back into 2D rows
+    return [result[i:i + width] for i in range(0, len(result), width)]
+
+
+def export_solution(mesh, name, metadata, out_dir='solution'):
     """
     Exports the final Lazor puzzle solution by writing it to a `.bff` file
     and generating a corresponding visual grid image.
@@ -12,9 +45,10 @@ def export_solution(mesh, name, metadata):
         name (str): Output filename (e.g., 'puzzle_solution.bff').
         metadata (list of str): List of configuration lines (e.g., block definitions, lasers)
                                 to include before and after the grid section.
+        out_dir (str): Directory the files are written to (default 'solution').
 
     Output:
-        - A `.bff` file saved in the `solution/` directory representing the solved board.
+        - A `.bff` file saved in the `out_dir` directory representing the solved board.
         - A `.png` plot image showing the block layout visually.
 
     Example Output:
@@ -23,20 +57,13 @@ def export_solution(mesh, name, metadata):
     """
 
     # Ensure the solution directory exists
-    os.makedirs('solution', exist_ok=True)
+    os.makedirs(out_dir, exist_ok=True)
 
-    # Flatten the mesh into a list of only block cells (ignore even-indexed rows/cols)
-    result = [mesh[j][i] for j in range(1, len(mesh), 2)
-                           for i in range(1, len(mesh[0]), 2)]
-
-    # Determine the number of columns in the original grid
-    width = (len(mesh[0]) - 1) // 2
-
-    # Convert the flattened result back into 2D rows
-    formatted = [result[i:i + width] for i in range(0, len(result), width)]
+    formatted = _board_rows(mesh)
+    width = len(formatted[0])
 
     # Write the solution grid to a .bff file
-    with open(os.path.join('solution', name), 'w') as f:
+    with open(os.path.join(out_dir, name), 'w') as f:
         for line in metadata:
             f.write(line + '\n')
         f.write("GRID START\n")
@@ -44,7 +71,7 @@ def export_solution(mesh, name, metadata):
             f.write(' '.join(row) + '\n')
         f.write("GRID STOP\n")
 
-    print(f"\n✅ Solution exported: solution/{name}\n")
+    print(f"\n✅ Solution exported: {os.path.join(out_dir, name)}\n")
 
     # Plot the grid with matplotlib
     plt.figure(figsize=(width, len(formatted)))
@@ -73,6 +100,110 @@ def export_solution(mesh, name, metadata):
     plt.gca().invert_yaxis()
 
     # Save the plot to file
-    plot_path = os.path.join('solution', name.replace('.bff', '.png'))
+    plot_path = os.path.join(out_dir, name.replace('.bff', '.png'))
     plt.savefig(plot_path, bbox_inches='tight')
     plt.close()
+
+
+class BatchExporter:
+    """
+    Streams the results of many puzzles into a single append-only JSON-lines file.
+
+    Each call to `write` appends one record (name, solved flag, grid rows, hit
+    points and any stats) through a buffered file handle, so solving large
+    batches avoids one small file, one image and one console line per puzzle.
+    Optionally, all boards are collected into one contact sheet image on close.
+
+    Attributes:
+        out_dir (str): Directory the batch files are written to.
+        path (str): Path of the JSON-lines results file.
+        sheet_path (str or None): Path of the contact sheet image, if enabled.
+        count (int): Number of records written so far.
+    """
+
+    def __init__(self, out_dir='solution', name='solutions.jsonl', buffer_size=1 << 16,
+                 contact_sheet=None):
+        """
+        Opens (or appends to) the results file.
+
+        Args:
+            out_dir (str): Directory the batch files are written to.
+            name (str): File name of the JSON-lines results file.
+            buffer_size (int): Write buffer size in bytes.
+            contact_sheet (str, optional): File name of a PNG showing every solved board.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.path = os.path.join(out_dir, name)
+        self.sheet_path = os.path.join(out_dir, contact_sheet) if contact_sheet else None
+        self.count = 0
+        self._boards = []
+        self._file = open(self.path, 'a', buffering=buffer_size)
+
+    def write(self, name, mesh=None, hits=(), stats=None):
+        """
+        Appends the result of one puzzle.
+
+        Args:
+            name (str): Identifier of the puzzle (e.g., its .bff file name).
+            mesh (list of list of str, optional): Solved mesh, or None if unsolved.
+            hits (iterable of tuple): Points (x, y) hit by the lasers.
+            stats (dict, optional): Extra values to store (e.g., trials, seconds).
+        """
+        rows = _board_rows(mesh) if mesh is not None else None
+        record = {
+            'name': name,
+            'solved': rows is not None,
+            'grid': [' '.join(row) for row in rows] if rows is not None else None,
+            'hits': [list(point) for point in hits],
+            'stats': stats or {},
+        }
+        self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self.count += 1
+
+        # Keep only the small block rows around for the contact sheet
+        if self.sheet_path and rows is not None:
+            self._boards.append(rows)
+
+    def close(self):
+        """
+        Flushes the results file and draws the contact sheet, if enabled.
+        """
+        if self._file.closed:
+            return
+        self._file.close()
+        if self.sheet_path and self._boards:
+            self._draw_contact_sheet()
+
+    def _draw_contact_sheet(self):
+        """
+        Draws every collected board into one image, tiled in the order written.
+        """
+        cols = math.ceil(math.sqrt(len(self._boards)))
+        tiles = math.ceil(len(self._boards) / cols)
+
+        # Every tile gets the size of the largest board plus a one cell gap
+        tile_h = max(len(rows) for rows in self._boards) + 1
+        tile_w = max(len(rows[0]) for rows in self._boards) + 1
+        sheet = [[SHEET_GAP] * (cols * tile_w) for _ in range(tiles * tile_h)]
+
+        for n, rows in enumerate(self._boards):
+            top, left = (n // cols) * tile_h, (n % cols) * tile_w
+            for y, row in enumerate(rows):
+                for x, cell in enumerate(row):
+                    sheet[top + y][left + x] = SHEET_VALUES.get(cell, 0)
+
+        # Write the cells straight to pixels so the image size (and memory)
+        # grows with the number of cells, not with a figure size
+        pixels = []
+        for row in sheet:
+            line = [value for value in row for _ in range(SHEET_SCALE)]
+            pixels.extend([line] * SHEET_SCALE)
+        plt.imsave(self.sheet_path, pixels, cmap=ListedColormap(SHEET_COLORS),
+                   vmin=0, vmax=len(SHEET_COLORS) - 1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
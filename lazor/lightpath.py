@@ -1,9 +1,14 @@
-from lazor.block import BlockBehavior
+from lazor.core import PuzzleCore, SYMBOL_CODES
 
 class LightPath:
     """
     Simulates the path of lasers as they traverse the game board mesh.
 
+    Tracing runs on the shared PuzzleCore engine. The core (and its trace
+    buffers) is built once and reused while the mesh size and lasers stay the
+    same; later calls only re-encode the block cells. The full path of every
+    beam is only recorded when requested with `keep_history`.
+
     Attributes:
         starts (list of tuple): Starting coordinates of all lasers.
         directions (list of tuple): Initial direction vectors for each laser.
@@ -19,114 +24,81 @@ class LightPath:
         """
         self.starts = starts
         self.directions = paths
+        self._core = None
+        self._block_cells = []
 
-    def _advance_laser(self, path, hits, grid, mesh, split_dirs, split_hits):
+    def _load(self, directions, mesh):
         """
-        Advances a single laser beam one step based on block interactions.
-
-        Depending on block properties (reflection, transmission), the beam may:
-        - Reflect
-        - Transmit (continue)
-        - Split into two beams
+        Returns the core holding the given mesh, building it only when needed.
 
         Args:
-            path (list): The path of the laser (direction vectors).
-            hits (list): The points the laser has visited.
-            grid (list): Original grid layout (not directly used here).
-            mesh (list): The expanded mesh of the board.
-            split_dirs (list): Direction vectors of newly split beams (refracted).
-            split_hits (list): Starting hit points for split beams.
+            directions (list of tuple): Initial laser direction vectors.
+            mesh (list of list): Expanded grid for laser movement.
 
         Returns:
-            tuple: Updated path, hits, split_dirs, and split_hits.
+            PuzzleCore: Core whose cells match the block cells of `mesh`.
         """
-        (dx, dy), (x, y) = path[-1], hits[-1]
-        options, transmit = [], []
-
-        # Check for adjacent block interaction in all 4 cardinal directions
-        for vx, vy in [(0, 1), (0, -1), (-1, 0), (1, 0)]:
-            nx, ny = x + vx, y + vy
-            if 0 < nx < len(mesh[0]) and 0 < ny < len(mesh):
-                dxn, dyn = nx - x, ny - y
-                reflect, transmit_thru = BlockBehavior(nx, ny).get_properties(mesh)
-
-                # Case 1: Reflect block (A)
-                if mesh[ny][nx] == 'A':
-                    options.append((-dx if dxn else dx, -dy if dyn else dy))
-
-                # Case 2: Opaque block (B)
-                elif not reflect and not transmit_thru:
-                    options.append((0, 0) if dxn == dx or dyn == dy else (dx, dy))
-
-                # Case 3: Refract block (C)
-                elif reflect and transmit_thru:
-                    if dxn == dx or dyn == dy:
-                        options.append((-dx if dxn else dx, -dy if dyn else dy))
-                        transmit.append((dx, dy))
-                    else:
-                        options.append((dx, dy))
-
-        # Update laser direction and hit position
-        path.append(options[-1] if options else (dx, dy))
-        if transmit:
-            split_dirs.append(transmit[-1])
-            split_hits.append((x, y))
-        hits.append((x + path[-1][0], y + path[-1][1]))
-
-        return path, hits, split_dirs, split_hits
-
-    def trace(self, directions, grid, mesh):
+        core = self._core
+        lasers = [(tuple(start), tuple(d)) for start, d in zip(self.starts, directions)]
+
+        # Build a new core if the board size or the lasers changed
+        if core is None or core.height != len(mesh) or core.width != len(mesh[0]) or core.lasers != lasers:
+            core = self._core = PuzzleCore(mesh, lasers=lasers)
+            self._block_cells = [
+                (x, y, core.index(x, y))
+                for y in range(1, core.height, 2)
+                for x in range(1, core.width, 2)
+            ]
+            return core
+
+        # Otherwise only the block cells can have changed
+        cells = core.cells
+        try:
+            for x, y, pos in self._block_cells:
+                cells[pos] = SYMBOL_CODES[mesh[y][x]]
+        except KeyError as err:
+            raise ValueError(f"Unknown grid symbol {err.args[0]!r}") from None
+        return core
+
+    def trace(self, directions, grid, mesh, keep_history=False):
         """
         Traces the paths of all lasers, including refracted beams from C blocks.
 
+        Note:
+            `flat_hits` is the sorted set of points hit by any beam (split beams
+            included), not the ordered trail of each laser; use `keep_history`
+            and `traces` when the order of the points matters.
+
         Args:
             directions (list of tuple): Initial laser direction vectors.
-            grid (list of list): Original grid layout.
+            grid (list of list): Original grid layout (not directly used here).
             mesh (list of list): Expanded grid for laser movement.
+            keep_history (bool): Record the path of every beam (e.g. for plotting).
 
         Returns:
             tuple:
-                flat_hits (list): All hit points of all lasers.
-                traces (list): Direction vectors for each laser.
-                split_hits (list): Points from which new beams were split.
+                flat_hits (list): Sorted points hit by any laser, including split beams.
+                traces (list): Direction vectors for each beam (empty without history).
+                split_hits (list): For each split beam, the point where it split off
+                    followed by the points it hit (empty without history).
         """
-        traces = [[p] for p in directions]
-        hits = [[s] for s in self.starts]
-        split_dirs, split_hits = [], []
-
-        # Process each laser beam from origin
-        for i in range(len(traces)):
-            if len(hits[i]) == 1:
-                traces[i], hits[i], split_dirs, split_hits = self._advance_laser(
-                    traces[i], hits[i], grid, mesh, split_dirs, split_hits
-                )
-
-            # Continue advancing until laser hits boundary or gets absorbed
-            while 0 < hits[i][-1][0] < len(mesh[0])-1 and 0 < hits[i][-1][1] < len(mesh)-1:
-                if traces[i][-1] != (0, 0):
-                    traces[i], hits[i], split_dirs, split_hits = self._advance_laser(
-                        traces[i], hits[i], grid, mesh, split_dirs, split_hits
-                    )
-                else:
-                    break
-
-        # Process any split beam caused by refractive blocks
-        if split_dirs:
-            dx, dy = split_dirs[-1]
-            x, y = split_hits[-1]
-            x_next, y_next = x + dx, y + dy
-            split_hits.append((x_next, y_next))
-
-            sub_dirs, sub_hits = [], []
-            while 0 < x_next < len(mesh[0])-1 and 0 < y_next < len(mesh)-1:
-                if split_dirs[-1] != (0, 0):
-                    split_dirs, split_hits, sub_dirs, sub_hits = self._advance_laser(
-                        split_dirs, split_hits, grid, mesh, sub_dirs, sub_hits
-                    )
-                else:
-                    break
-                x_next, y_next = split_hits[-1]
+        core = self._load(directions, mesh)
+        beams = [] if keep_history else None
 
         # Flatten hit positions from all beams
-        flat_hits = [pt for trail in hits for pt in trail]
+        flat_hits = [core.point(pos) for pos in sorted(core.trace(beams=beams))]
+        if not keep_history:
+            return flat_hits, [], []
+
+        # Rebuild direction vectors and split hits from the recorded paths
+        traces, split_hits = [], []
+        for beam in beams:
+            points = [core.point(pos) for pos in beam.path]
+            traces.append([(beam.dx, beam.dy)] + [
+                (x1 - x0, y1 - y0) for (x0, y0), (x1, y1) in zip(points, points[1:])
+            ])
+            if beam.split:
+                split_hits.append((beam.x - beam.dx, beam.y - beam.dy))
+                split_hits.extend(points)
+
         return flat_hits, traces, split_hits
@@ -1,77 +1,184 @@
 """
 Main solver module for the Lazor Puzzle.
 
-This script iteratively attempts to solve all .bff puzzle files in a specified folder using randomized block placement.
+This script attempts to solve all .bff puzzle files in a specified folder by enumerating block placements.
 If a valid solution is found (i.e., all laser paths hit all target points), it exports the resulting grid and generates a visualization.
 
+It also provides the numpy-based API used together with `reader.read_bff`
+(get_open, pos_check, get_configs, game_solver). Both entry points convert
+their board into a single PuzzleCore and share its search and tracing.
+
 Modules Used:
 - LazorConfig: Parses and loads puzzle configuration from .bff file.
-- GridBuilder: Generates and manages the grid layout with blocks.
-- LightPath: Simulates laser behavior through the grid.
+- PuzzleCore: Integer-coded puzzle used for placement search and laser tracing.
 - export_solution: Outputs the solved configuration to a file and image.
+- BatchExporter: Streams the results of many puzzles into one JSON-lines file.
 
 """
 
 from lazor.config import LazorConfig
-from lazor.grid import GridBuilder
-from lazor.lightpath import LightPath
-from lazor.exporter import export_solution
+from lazor.core import PuzzleCore, CODE_SYMBOLS
+from lazor.exporter import export_solution, BatchExporter
 
 import os
-import random
-
-
-def run_solver(file_path, max_trials=500000):
+import time
+
+
+def pos_check(pos, grid):
+    '''
+    Checks whether a position lies inside the grid
+    *** Args ***
+        pos: tuple, int
+            (x,y) position to check
+        grid: np array
+            game grid indexed grid[y,x]
+    *** Returns ***
+        bool
+            True if the position is on the grid
+    '''
+    x, y = pos
+    return 0 <= x < len(grid[0]) and 0 <= y < len(grid)
+
+
+def get_open(grid):
+    '''
+    Finds the open spaces ('o') where blocks can be placed
+    *** Args ***
+        grid: np array
+            game grid indexed grid[y,x]
+    *** Returns ***
+        opens: list, tuple, int
+            list of open positions (x,y)
+    '''
+    core = PuzzleCore(grid)
+    return [core.point(slot) for slot in core.open_slots]
+
+
+def get_configs(grid, num_blocks):
+    '''
+    Lists every distinct way of placing the blocks in the open spaces
+    *** Args ***
+        grid: np array
+            game grid indexed grid[y,x]
+        num_blocks: tuple, int
+            (num_A,num_B,num_C) to be placed
+    *** Returns ***
+        configs: list, tuple, str
+            one tuple per configuration with a symbol ('A','B','C' or 'o')
+            for each open space, in the order returned by get_open
+    '''
+    core = PuzzleCore(grid, num_blocks)
+    return [tuple(CODE_SYMBOLS[code] for code in layout) for layout in core.placements()]
+
+
+def game_solver(game_grid, num_blocks, lasers, points):
+    '''
+    Solves a board read by reader.read_bff
+    *** Args ***
+        game_grid: np array
+            initial grid with open spaces, x spaces, and fixed blocks
+        num_blocks: tuple, int
+            (num_A,num_B,num_C) to be placed
+        lasers: list, tuple, tuple, int
+            list of lasers ((x,y),(vx,vy))
+        points: list, tuple, int
+            list of target points (x,y)
+    *** Returns ***
+        solution: np array
+            the solved grid
+        lasers_trajs: list, tuple, int
+            all points (x,y) hit by lasers
+    '''
+    core = PuzzleCore(game_grid, num_blocks, lasers, points)
+    result = core.solve()
+    if result is None:
+        raise Exception('Solver error - no solution found')
+    layout, hits = result
+
+    # copy the grid and write the placed blocks into it
+    solution = game_grid.copy()
+    for slot, code in zip(core.open_slots, layout):
+        x, y = core.point(slot)
+        solution[y, x] = CODE_SYMBOLS[code]
+
+    lasers_trajs = sorted(core.point(hit) for hit in hits)
+    return solution, lasers_trajs
+
+
+def run_solver(file_path, max_trials=500000, out_dir='solution', sink=None):
     """
-    Attempt to solve a Lazor puzzle using randomized block placement.
+    Attempt to solve a Lazor puzzle by enumerating block placements.
 
     Parameters:
         file_path (str): Path to the .bff puzzle file.
-        max_trials (int): Maximum number of randomized attempts allowed before giving up.
+        max_trials (int): Maximum number of placements tried before giving up.
+        out_dir (str): Directory the solution files are exported to.
+        sink (BatchExporter, optional): If given, the result is appended to it
+            instead of being exported and printed.
 
     Returns:
-        None
-        - Exports solution to the 'solution' directory if successful.
-        - Prints a message to console indicating success or failure.
+        bool: True if the puzzle was solved.
+        - Exports solution to `out_dir` (or the sink) if successful.
+        - Prints a message to console indicating failure when no sink is given.
     """
 
-    # Load puzzle configuration from file
+    # Load puzzle configuration from file and encode it once
     config = LazorConfig(file_path)
+    core = config.to_core()
+
+    # Search placements until all target points are hit by the lasers
+    start = time.perf_counter()
+    result = core.solve(max_trials)
+    elapsed = time.perf_counter() - start
+
+    if sink is not None:
+        # Stream the result into the batch file, solved or not
+        mesh, hits = None, ()
+        if result is not None:
+            mesh = core.to_mesh(result[0])
+            hits = sorted(core.point(pos) for pos in result[1])
+        stats = {'seconds': round(elapsed, 6), 'trials': core.trials, 'exhausted': core.exhausted}
+        sink.write(os.path.basename(file_path), mesh, hits, stats)
+        return result is not None
+
+    if result is not None:
+        layout, _ = result
+
+        # Generate output filename for solution
+        output_name = os.path.basename(file_path).replace('.bff', '_solution.bff')
+
+        # Export solved board to file and image
+        export_solution(core.to_mesh(layout), output_name, config.metadata_lines, out_dir)
+        return True
+
+    # Every placement was tried, so the board has no solution
+    if core.exhausted:
+        print(f"\n‼️ No solution exists for {file_path} ({core.trials} placements tried)")
+        return False
 
-    # Try multiple random configurations up to the allowed number of trials
-    for _ in range(max_trials):
-        
-        # Create a fresh board from the original layout
-        board = GridBuilder(config.grid_layout)
-
-        # Attempt to assign movable blocks randomly into open slots
-        candidate = board.assign_blocks_randomly(config.available_blocks)
-
-        # If assignment fails (more blocks than spaces), skip this trial
-        if candidate is None:
-            continue
-
-        # Convert the board into a mesh format used for laser simulation
-        mesh = board.generate_mesh()
-
-        # Create a LightPath object to simulate laser movement
-        sim = LightPath(config.lazor_start, config.lazor_path)
-
-        # Trace the laser paths and collect hit points and split hits
-        hit_points, _, extra_hits = sim.trace(config.lazor_path, config.grid_layout, mesh)
+    # If no valid configuration found after all trials
+    print(f"\n‼️ Unable to solve: {file_path} after {core.trials} trials")
+    return False
 
-        # Check if all target points are hit by any laser path
-        if all(target in hit_points + extra_hits for target in config.targets):
 
-            # Generate output filename for solution
-            output_name = os.path.basename(file_path).replace('.bff', '_solution.bff')
+def run_batch(input_dir, out_dir='solution', max_trials=500000, contact_sheet=None):
+    """
+    Solve every .bff file in a directory into one consolidated results file.
 
-            # Export solved board to file and image
-            export_solution(mesh, output_name, config.metadata_lines)
-            return
+    Parameters:
+        input_dir (str): Directory containing the .bff puzzle files.
+        out_dir (str): Directory for the results file (and contact sheet).
+        max_trials (int): Maximum number of placements tried per puzzle.
+        contact_sheet (str, optional): File name of a PNG showing all solved boards.
 
-    # If no valid configuration found after all trials
-    print(f"\n‼️ Unable to solve: {file_path} after {max_trials} trials")
+    Returns:
+        str: Path of the JSON-lines results file.
+    """
+    with BatchExporter(out_dir, contact_sheet=contact_sheet) as sink:
+        for file in sorted(os.listdir(input_dir)):
+            if file.endswith('.bff'):
+                run_solver(os.path.join(input_dir, file), max_trials, sink=sink)
+    return sink.path
 
 
 if __name__ == '__main__':
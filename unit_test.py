@@ -1,6 +1,15 @@
+import os
+import json
+import shutil
+import struct
+import tempfile
 import unittest
 import numpy as np
 from Lazors import reader, solver
+from lazor.config import LazorConfig
+from lazor.core import PuzzleCore
+from lazor.lightpath import LightPath
+from lazor.exporter import BatchExporter, SHEET_SCALE
 
 class TestPosCheck(unittest.TestCase):
     ''' testing of pos_check function'''
@@ -50,5 +59,163 @@ class TestGetConfigs(unittest.TestCase):
         self.assertTrue(len(configs)==3)
         # should be 3 configs (C placed in any of the three opens)
 
+class TestGameSolver(unittest.TestCase):
+    def test_1(self):
+        bff=os.path.join(os.path.dirname(__file__),'bff_files','unit_test_sample.bff')
+        grid,num_blocks,lasers,points=reader.read_bff(bff)
+        solution,trajs=solver.game_solver(grid,num_blocks,lasers,points)
+        self.assertTrue(all(p in trajs for p in points))
+        # every target point should be hit by the solved board
+
+    def test_2(self):
+        bff=os.path.join(os.path.dirname(__file__),'bff_files','unit_test_sample.bff')
+        grid,num_blocks,lasers,points=reader.read_bff(bff)
+        solution,trajs=solver.game_solver(grid,num_blocks,lasers,points)
+        self.assertTrue(sum(solution.flatten()=='A')==3 and sum(solution.flatten()=='B')==3)
+        # all of the blocks should be placed
+
+class TestSymmetry(unittest.TestCase):
+    def test_1(self):
+        grid=np.zeros((5,5),dtype=str)
+        grid[1::2,1::2]='o'
+        core=solver.PuzzleCore(grid,(2,0,0))
+        self.assertTrue(len(core.symmetries())==8)
+        # an empty 2x2 board has all 8 square symmetries
+
+    def test_2(self):
+        grid=np.zeros((5,5),dtype=str)
+        grid[1::2,1::2]='o'
+        core=solver.PuzzleCore(grid,(2,0,0))
+        configs=list(core.placements(canonical=True))
+        self.assertTrue(len(configs)==2)
+        # 6 ways to place 2 A blocks, but only side-by-side or diagonal up to symmetry
+
+    def test_3(self):
+        grid=np.zeros((5,5),dtype=str)
+        grid[1::2,1::2]='o'
+        core=solver.PuzzleCore(grid,(2,0,0),[((0,1),(1,1))],[(2,1)])
+        self.assertTrue(len(core.symmetries())==1)
+        # a single laser in the corner breaks the symmetry
+
+class TestPuzzleCore(unittest.TestCase):
+    ''' testing of the bounds checks on PuzzleCore'''
+    def test_1(self):
+        with self.assertRaises(ValueError):
+            PuzzleCore.from_layout([['o','o']],(0,0,0),[((0,1),(1,-1))],[(5,0)])
+        # target past the right edge of the 5x3 mesh
+
+    def test_2(self):
+        with self.assertRaises(ValueError):
+            PuzzleCore.from_layout([['o','o']],(0,0,0),[((0,1),(1,-1))],[(1,-1)])
+        # negative target coordinate
+
+    def test_3(self):
+        with self.assertRaises(ValueError):
+            PuzzleCore.from_layout([['o','o']],(0,0,0),[((0,3),(1,-1))],[(1,0)])
+        # laser starting below the mesh
+
+    def test_4(self):
+        core=PuzzleCore.from_layout([['o','o']],(1,0,0),[((0,1),(1,-1))],[(1,1)])
+        self.assertTrue(core.solve(max_trials=10) is None and core.trials==2 and core.exhausted)
+        # the target is a block centre so no laser can hit it and both placements get tried
+
+    def test_5(self):
+        core=PuzzleCore.from_layout([['o','o']],(1,0,0),[((0,1),(1,-1))],[(1,1)])
+        self.assertTrue(core.solve(max_trials=1) is None and core.trials==1 and not core.exhausted)
+        # stopping at max_trials doesn't mean there is no solution
+
+class TestTrace(unittest.TestCase):
+    ''' testing of the laser trace engine and LightPath'''
+    def test_1(self):
+        core=PuzzleCore.from_layout([['C']],lasers=[((0,1),(1,1))])
+        flat_hits,traces,split_hits=LightPath([(0,1)],[(1,1)]).trace([(1,1)],None,core.to_mesh(),keep_history=True)
+        self.assertTrue(len(traces)==2)
+        self.assertTrue(split_hits==[(0,1),(1,2)])
+        # the C block splits the laser into a second beam that starts at (1,2)
+
+    def test_2(self):
+        core=PuzzleCore.from_layout([['A','A','A'],['A','o','A'],['A','A','A']],lasers=[((2,3),(1,-1))])
+        hits=core.trace()
+        self.assertTrue(hits=={core.index(x,y) for x,y in [(2,3),(3,2),(4,3),(3,4)]})
+        # the laser bounces around the middle block forever so the trace has to stop the loop
+
+    def test_3(self):
+        config=LazorConfig(os.path.join(os.path.dirname(__file__),'bff_files','tiny_5.bff'))
+        core=config.to_core()
+        mesh=core.to_mesh(core.solve()[0])
+        path=LightPath(config.lazor_start,config.lazor_path)
+        with_history=path.trace(config.lazor_path,config.grid_layout,mesh,keep_history=True)[0]
+        without_history=path.trace(config.lazor_path,config.grid_layout,mesh)[0]
+        self.assertTrue(with_history==without_history)
+        # keeping the history should not change what gets hit
+
+    def test_4(self):
+        config=LazorConfig(os.path.join(os.path.dirname(__file__),'bff_files','tiny_5.bff'))
+        core=config.to_core()
+        for layout in core.placements():
+            cells=core.apply(layout)
+            self.assertTrue(core.hits_targets(cells)==(core.targets<=core.trace(cells)))
+        # consecutive traces reuse the same buffers so they have to agree every time
+
+class TestBatchExporter(unittest.TestCase):
+    ''' testing of the batch results file'''
+    def setUp(self):
+        self.tmp=tempfile.TemporaryDirectory()
+        self.input_dir=os.path.join(self.tmp.name,'bff')
+        os.makedirs(self.input_dir)
+        for name in ['tiny_5.bff','dark_1.bff']:
+            shutil.copy(os.path.join(os.path.dirname(__file__),'bff_files',name),self.input_dir)
+        self.out_dir=os.path.join(self.tmp.name,'out')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_records(self,path):
+        with open(path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_1(self):
+        path=solver.run_batch(self.input_dir,self.out_dir)
+        records=self.read_records(path)
+        self.assertTrue([r['name'] for r in records]==['dark_1.bff','tiny_5.bff'])
+        for r in records:
+            self.assertTrue(set(r)=={'name','solved','grid','hits','stats'})
+            self.assertTrue(r['solved'] and len(r['hits'])>0)
+            self.assertTrue(r['stats']['trials']>0 and 'seconds' in r['stats'])
+        # one record per puzzle with all of the keys
+
+    def test_2(self):
+        with BatchExporter(self.out_dir) as sink:
+            solver.run_solver(os.path.join(self.input_dir,'tiny_5.bff'),max_trials=0,sink=sink)
+        record=self.read_records(sink.path)[0]
+        self.assertTrue(record['solved'] is False and record['grid'] is None)
+        self.assertTrue(record['stats']['trials']==0 and not record['stats']['exhausted'])
+        # zero trials can't solve anything so the grid is written as null
+
+    def test_3(self):
+        path=solver.run_batch(self.input_dir,self.out_dir)
+        solver.run_batch(self.input_dir,self.out_dir)
+        self.assertTrue(len(self.read_records(path))==4)
+        # the second run appends to the same file
+
+    def test_4(self):
+        solver.run_batch(self.input_dir,self.out_dir)
+        self.assertFalse(os.path.exists(os.path.join(self.out_dir,'sheet.png')))
+        solver.run_batch(self.input_dir,self.out_dir,contact_sheet='sheet.png')
+        self.assertTrue(os.path.exists(os.path.join(self.out_dir,'sheet.png')))
+        # the contact sheet is only drawn when asked for
+
+    def test_5(self):
+        config=LazorConfig(os.path.join(self.input_dir,'tiny_5.bff'))
+        core=config.to_core()
+        mesh=core.to_mesh(core.solve()[0])
+        with BatchExporter(self.out_dir,contact_sheet='sheet.png') as sink:
+            for i in range(1000):
+                sink.write('tiny_5.bff',mesh)
+        with open(os.path.join(self.out_dir,'sheet.png'),'rb') as f:
+            width,height=struct.unpack('>II',f.read(24)[16:24])
+        self.assertTrue(width==32*4*SHEET_SCALE and height==32*4*SHEET_SCALE)
+        # 1000 3x3 boards tile 32x32 with a gap cell each, at a fixed number of pixels per cell
+
 if __name__=='__main__':
     unittest.main()
\ No newline at end of file